@@ -1,12 +1,15 @@
 """API route handlers."""
 
 import uuid
-from fastapi import APIRouter, BackgroundTasks, WebSocket, HTTPException
+import time
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, WebSocket, HTTPException, Response
 from ..models.schemas import (
     AnalysisRequest, AnalysisStartResponse, GameAnalysisResult, HealthResponse
 )
 from ..utils.pgn import parse_pgn, validate_pgn_length
-from ..engine.analyzer import analyze_game, get_analysis_result
+from ..engine.analyzer import analyze_game, get_analysis_result_json, analysis_semaphore
 from ..engine.stockfish import StockfishEngine
 from ..ws.manager import WSManager
 from ..utils.logging import logger
@@ -15,12 +18,25 @@ from ..config import settings
 router = APIRouter()
 ws_manager = WSManager()
 
+# Running analyses, kept referenced so they are not garbage collected mid-run
+analysis_tasks: set[asyncio.Task] = set()
+
+# Health probes reuse one small engine and a short-lived cached result
+HEALTH_CACHE_TTL_S = 5.0
+_health_engine: Optional[StockfishEngine] = None
+_health_cache: Optional[tuple[float, HealthResponse]] = None
+_health_lock = asyncio.Lock()
+
+
+def _on_analysis_done(task: asyncio.Task):
+    """Forget a finished analysis task and log any error it raised."""
+    analysis_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Analysis task failed: {str(task.exception())}")
+
 
 @router.post("/api/analyze", response_model=AnalysisStartResponse)
-async def analyze_endpoint(
-    request: AnalysisRequest,
-    background_tasks: BackgroundTasks
-):
+async def analyze_endpoint(request: AnalysisRequest):
     """
     Start game analysis.
     
@@ -41,20 +57,24 @@ async def analyze_endpoint(
             f"depth={request.engine_depth}"
         )
         
-        # Schedule background analysis
-        background_tasks.add_task(
-            analyze_game,
+        # Run analysis as an independent task, detached from this request.
+        # Stockfish runs in its own processes and is awaited via threads, so
+        # the event loop stays free to serve other requests meanwhile.
+        task = asyncio.create_task(analyze_game(
             task_id=task_id,
             moves=moves,
             headers=headers,
             depth=request.engine_depth,
             time_per_move_ms=request.time_per_move_ms,
             ws_manager=ws_manager
-        )
+        ))
+        analysis_tasks.add(task)
+        task.add_done_callback(_on_analysis_done)
         
+        # Checked before the task runs: it waits if every slot is taken
         return AnalysisStartResponse(
             task_id=task_id,
-            status="started",
+            status="queued" if analysis_semaphore.locked() else "started",
             total_moves=len(moves)
         )
         
@@ -71,17 +91,19 @@ async def get_game_endpoint(task_id: str):
     """
     Retrieve complete game analysis result.
     
-    Returns cached analysis for the given task ID.
+    Returns cached analysis for the given task ID. The result is stored
+    already serialized, so it is sent as is instead of being re-validated
+    and re-encoded on every request.
     """
     logger.info(f"Fetching complete analysis: task_id={task_id}")
     
-    result = get_analysis_result(task_id)
+    result_json = get_analysis_result_json(task_id)
     
-    if result is None:
+    if result_json is None:
         logger.warning(f"Analysis not found for task_id={task_id}")
         raise HTTPException(status_code=404, detail="Analysis not found or still in progress")
     
-    return result
+    return Response(content=result_json, media_type="application/json")
 
 
 @router.websocket("/ws/analyze/{task_id}")
@@ -105,11 +127,31 @@ async def health_endpoint():
     """
     Health check endpoint.
     
-    Verifies that the API and Stockfish engine are operational.
+    Verifies that the API and Stockfish engine are operational. The engine
+    is probed at most once every HEALTH_CACHE_TTL_S seconds; probes in
+    between get the last result.
     """
+    return await check_engine_health()
+
+
+async def check_engine_health() -> HealthResponse:
+    """Return the cached engine health, refreshing it if it has expired."""
+    global _health_cache
+    
+    async with _health_lock:
+        if _health_cache is None or time.monotonic() - _health_cache[0] >= HEALTH_CACHE_TTL_S:
+            health = await asyncio.to_thread(_probe_engine)
+            _health_cache = (time.monotonic(), health)
+        return _health_cache[1]
+
+
+def _probe_engine() -> HealthResponse:
+    global _health_engine
+    
     try:
-        engine = StockfishEngine()
-        is_available = engine.is_available()
+        if _health_engine is None:
+            _health_engine = StockfishEngine(depth=1, threads=1, hash_mb=16)
+        is_available = _health_engine.is_available()
         
         if is_available:
             logger.info("Health check: OK")
@@ -119,6 +161,8 @@ async def health_endpoint():
                 message="Engine is operational"
             )
         else:
+            # Drop the unresponsive process; the next probe starts a new one
+            _health_engine = None
             logger.warning("Health check: Engine unavailable")
             return HealthResponse(
                 status="unhealthy",
@@ -3,13 +3,19 @@
 import os
 import platform
 import shutil
+from functools import lru_cache
+from typing import Optional
+from pydantic import Field
 from pydantic_settings import BaseSettings
 
 
+@lru_cache(maxsize=1)
 def find_stockfish_path() -> str:
     """
     Automatically detect Stockfish executable path based on the operating system.
     
+    The filesystem probe runs once per process; later calls return the cached path.
+    
     Returns:
         Path to Stockfish executable, or default fallback path.
     """
@@ -60,11 +66,16 @@ class Settings(BaseSettings):
     """Application settings."""
     
     # Engine settings
-    STOCKFISH_PATH: str = find_stockfish_path()
+    # Probed only when STOCKFISH_PATH isn't set in the environment or .env
+    STOCKFISH_PATH: str = Field(default_factory=find_stockfish_path)
     ENGINE_DEPTH: int = 10
-    ENGINE_THREADS: int = 4
-    ENGINE_HASH_MB: int = 256
+    ENGINE_THREADS: int = 4  # Search threads per analysis, split across the pool
+    ENGINE_HASH_MB: int = 256  # Hash per analysis, split across the pool
+    ENGINE_POOL_SIZE: int = 4  # Stockfish processes searching positions in parallel
+    MAX_CONCURRENT_ANALYSES: Optional[int] = None  # Default: CPU cores / threads per analysis
     TIME_PER_MOVE_MS: int = 300
+    POSITION_CACHE_SIZE: int = 100000  # Search results reused across games
+    OPENING_BOOK_PATH: Optional[str] = None  # Polyglot .bin book; book moves skip the engine
     
     # Classification thresholds (in centipawns)
     # Based on new specification (diff_cp is absolute loss compared to best move):
@@ -91,9 +102,21 @@ class Settings(BaseSettings):
     # API settings
     MAX_PGN_LENGTH: int = 20000
     CORS_ORIGINS: list[str] = ["*"]
+    LOG_LEVEL: str = "INFO"  # WARNING skips the per-move analysis logs
+    
+    # Result storage (Redis is shared across workers; otherwise in-process LRU)
+    REDIS_URL: Optional[str] = None
+    ANALYSIS_CACHE_SIZE: int = 128
+    ANALYSIS_TTL_SECONDS: int = 3600
     
     class Config:
         env_file = ".env"
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, reading `.env` only on first use."""
+    return Settings()
+
+
+settings = get_settings()
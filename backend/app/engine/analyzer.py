@@ -1,18 +1,85 @@
+import os
 import chess
 import asyncio
+from collections import OrderedDict
 from typing import Optional
-from ..engine.stockfish import StockfishEngine, get_cp_evaluation
-from ..engine.classification import classify_move, classify_move_by_winrate, calculate_accuracy, compute_win_probability
+from ..config import settings
+from ..engine.stockfish import StockfishEngine
+from ..engine.book import get_opening_book, find_book_line
+from ..engine.classification import (
+    classify_move, classify_move_by_winrate, calculate_accuracy, calculate_move_accuracy,
+    compute_win_probability,
+    CLASSIFICATIONS, CLASSIFICATION_INDEX
+)
 from ..models.schemas import (
     MoveAnalysis, EngineEvaluation, PlayerSummary, GameSummary,
-    GameAnalysisResult, StreamingUpdate, MoveArrow, CompletionMessage
+    GameAnalysisResult, MoveArrow, CompletionMessage
 )
 from ..utils.logging import logger
+from ..utils.storage import StorageBackend, create_storage
+
+
+analysis_storage: StorageBackend = create_storage(
+    GameAnalysisResult,
+    redis_url=settings.REDIS_URL,
+    maxsize=settings.ANALYSIS_CACHE_SIZE,
+    ttl_seconds=settings.ANALYSIS_TTL_SECONDS
+)
+
+# Each analysis runs ENGINE_POOL_SIZE Stockfish processes that share
+# ENGINE_THREADS search threads between them
+ENGINE_THREADS_PER_PROCESS = max(1, settings.ENGINE_THREADS // settings.ENGINE_POOL_SIZE)
+
+# Limit concurrent analyses so engine pools don't oversubscribe the CPU
+analysis_semaphore = asyncio.Semaphore(
+    settings.MAX_CONCURRENT_ANALYSES
+    or max(1, (os.cpu_count() or 1) // (settings.ENGINE_POOL_SIZE * ENGINE_THREADS_PER_PROCESS))
+)
+
+# Stockfish processes kept between games, so an analysis doesn't pay for
+# process start-up and the UCI handshake. Every engine in here is idle.
+idle_engines: list[StockfishEngine] = []
+
+# Search results shared across games (LRU), keyed by position and depth, so
+# positions that recur between games (mostly openings) are searched once
+position_cache: OrderedDict[tuple[str, int], tuple[Optional[str], int]] = OrderedDict()
+
+
+def _position_key(fen: str, depth: int) -> tuple[str, int]:
+    # The fullmove number doesn't affect the search; the halfmove clock does
+    return fen.rsplit(" ", 1)[0], depth
+
+
+def _get_cached_search(fen: str, depth: int) -> Optional[tuple[Optional[str], int]]:
+    key = _position_key(fen, depth)
+    result = position_cache.get(key)
+    if result is not None:
+        position_cache.move_to_end(key)
+    return result
 
 
-analysis_storage: dict[str, GameAnalysisResult] = {}
+def _cache_search(fen: str, depth: int, result: tuple[Optional[str], int]) -> None:
+    # A missing best move means the search failed; don't keep it
+    if result[0] is None:
+        return
+    position_cache[_position_key(fen, depth)] = result
+    position_cache.move_to_end(_position_key(fen, depth))
+    while len(position_cache) > settings.POSITION_CACHE_SIZE:
+        position_cache.popitem(last=False)
 
-def is_opening_phase(board: chess.Board, move_number: int, move: chess.Move, eval_diff_cp: int = 0) -> bool:
+
+# Starting squares of the minor pieces: b1, c1, f1, g1 and b8, c8, f8, g8
+WHITE_MINOR_START = chess.BB_B1 | chess.BB_C1 | chess.BB_F1 | chess.BB_G1
+BLACK_MINOR_START = chess.BB_B8 | chess.BB_C8 | chess.BB_F8 | chess.BB_G8
+
+
+def is_opening_phase(
+    board: chess.Board,
+    move_number: int,
+    move: chess.Move,
+    eval_diff_cp: int = 0,
+    gives_check: Optional[bool] = None
+) -> bool:
     """
     Intelligent opening phase detection.
     
@@ -29,6 +96,8 @@ def is_opening_phase(board: chess.Board, move_number: int, move: chess.Move, eva
         move_number: Current move number (starting from 0)
         move: The move being played
         eval_diff_cp: Evaluation difference for this move
+        gives_check: Whether the move gives check, if already known (saves a
+            push/pop of the move)
     
     Returns:
         True if still in opening, False if middlegame/endgame
@@ -43,7 +112,7 @@ def is_opening_phase(board: chess.Board, move_number: int, move: chess.Move, eva
     
     # Check for tactical complications (suggests opening theory is over)
     is_capture = board.is_capture(move)
-    is_check = board.gives_check(move)
+    is_check = board.gives_check(move) if gives_check is None else gives_check
     
     # CRITICAL FIX: If there's a sharp tactical blow (check/capture with big eval swing),
     # opening is OVER regardless of move number
@@ -51,73 +120,142 @@ def is_opening_phase(board: chess.Board, move_number: int, move: chess.Move, eva
         # If eval swing is significant (>80cp), it's a tactical blow = middlegame
         if eval_diff_cp > 80:
             logger.info(
-                f"Move {move_number}: SHARP TACTICAL BLOW detected "
-                f"(capture={is_capture}, check={is_check}, eval_swing={eval_diff_cp}cp) - MIDDLEGAME"
+                "Move {}: SHARP TACTICAL BLOW detected "
+                "(capture={}, check={}, eval_swing={}cp) - MIDDLEGAME",
+                move_number, is_capture, is_check, eval_diff_cp
             )
             return False
         
         # If capture/check after move 6, likely leaving opening
         if move_number >= 6:
             logger.info(
-                f"Move {move_number}: Tactical complication detected "
-                f"(capture={is_capture}, check={is_check}) - likely middlegame"
+                "Move {}: Tactical complication detected "
+                "(capture={}, check={}) - likely middlegame",
+                move_number, is_capture, is_check
             )
             return False
     
-    # Count developed pieces (not on starting squares)
-    white_developed = 0
-    black_developed = 0
-    
-    # White's starting squares for minor pieces: b1, c1, f1, g1
-    # Black's starting squares: b8, c8, f8, g8
-    white_minor_start = [chess.B1, chess.C1, chess.F1, chess.G1]
-    black_minor_start = [chess.B8, chess.C8, chess.F8, chess.G8]
-    
-    for square in chess.SQUARES:
-        piece = board.piece_at(square)
-        if piece:
-            # Count developed minor pieces
-            if piece.piece_type in [chess.KNIGHT, chess.BISHOP]:
-                if piece.color == chess.WHITE and square not in white_minor_start:
-                    white_developed += 1
-                elif piece.color == chess.BLACK and square not in black_minor_start:
-                    black_developed += 1
-    
-    # Check castling rights (if castling happened, castling rights are lost)
-    white_castled = not (board.has_kingside_castling_rights(chess.WHITE) or 
-                        board.has_queenside_castling_rights(chess.WHITE))
-    black_castled = not (board.has_kingside_castling_rights(chess.BLACK) or 
-                        board.has_queenside_castling_rights(chess.BLACK))
-    
-    # If both sides castled, opening is over
-    if white_castled and black_castled:
-        logger.info(f"Move {move_number}: Both sides castled - middlegame")
+    # If both sides castled, opening is over (castling, or moving the king
+    # or rooks, gives up castling rights)
+    if not board.clean_castling_rights():
+        logger.info("Move {}: Both sides castled - middlegame", move_number)
         return False
     
     # Check if queens are traded
-    white_queen_exists = False
-    black_queen_exists = False
-    for square in chess.SQUARES:
-        piece = board.piece_at(square)
-        if piece and piece.piece_type == chess.QUEEN:
-            if piece.color == chess.WHITE:
-                white_queen_exists = True
-            else:
-                black_queen_exists = True
-    
-    if not white_queen_exists and not black_queen_exists:
-        logger.info(f"Move {move_number}: Queens traded - middlegame/endgame")
+    if not board.queens:
+        logger.info("Move {}: Queens traded - middlegame/endgame", move_number)
         return False
     
-    # After move 12, if both sides developed 3+ pieces, opening is over
-    if move_number >= 12 and white_developed >= 3 and black_developed >= 3:
-        logger.info(f"Move {move_number}: Both sides developed (W:{white_developed}, B:{black_developed}) - middlegame")
-        return False
+    # After move 12, if both sides developed 3+ minor pieces (off their
+    # starting squares), opening is over
+    if move_number >= 12:
+        minors = board.knights | board.bishops
+        white_developed = chess.popcount(minors & board.occupied_co[chess.WHITE] & ~WHITE_MINOR_START)
+        black_developed = chess.popcount(minors & board.occupied_co[chess.BLACK] & ~BLACK_MINOR_START)
+        if white_developed >= 3 and black_developed >= 3:
+            logger.info(
+                "Move {}: Both sides developed (W:{}, B:{}) - middlegame",
+                move_number, white_developed, black_developed
+            )
+            return False
     
     # Otherwise, still in opening
     return True
 
 
+async def _acquire_engines(count: int, depth: int) -> list[StockfishEngine]:
+    """
+    Take engines from the idle pool, starting more if needed.
+    
+    Spawning the process and the UCI handshake are blocking, so they run off
+    the event loop. Threads and hash are sized so a full pool fits in
+    ENGINE_THREADS and ENGINE_HASH_MB.
+    
+    Args:
+        count: Number of engines needed
+        depth: Search depth for this game
+    
+    Returns:
+        Engines ready to search a new game
+    """
+    engines = [idle_engines.pop() for _ in range(min(count, len(idle_engines)))]
+    try:
+        engines += await asyncio.gather(*[
+            asyncio.to_thread(
+                StockfishEngine,
+                depth=depth,
+                threads=ENGINE_THREADS_PER_PROCESS,
+                hash_mb=max(16, settings.ENGINE_HASH_MB // settings.ENGINE_POOL_SIZE)
+            )
+            for _ in range(count - len(engines))
+        ])
+        for engine in engines:
+            engine.set_depth(depth)
+        # Clear hash once per game; searches within the game keep it warm
+        await asyncio.gather(*[asyncio.to_thread(engine.new_game) for engine in engines])
+    except BaseException:
+        # Don't lose the engines taken from the pool if starting the others fails
+        _release_engines(engines)
+        raise
+    return engines
+
+
+def _release_engines(engines: list[StockfishEngine]) -> None:
+    """Return engines to the idle pool, dropping any whose process has died."""
+    idle_engines.extend(engine for engine in engines if engine.is_running())
+
+
+def _start_position_workers(
+    engines: list[StockfishEngine],
+    fens: list[Optional[str]],
+    depth: int,
+    cached: list[Optional[tuple[Optional[str], int]]]
+) -> tuple[list[asyncio.Future], list[asyncio.Task]]:
+    """
+    Dispatch position searches to a pool of engines.
+    
+    Each engine runs in its own worker pulling (index, fen) jobs from a shared
+    queue, so positions are searched in parallel while results stay addressable
+    by position index.
+    
+    Args:
+        engines: One Stockfish process per worker
+        fens: Positions to search; None entries are skipped
+        depth: Search depth, used to key the position cache
+        cached: Results already in the position cache; these aren't searched again
+    
+    Returns:
+        Tuple of (one future per position, worker tasks)
+    """
+    loop = asyncio.get_running_loop()
+    results: list[asyncio.Future] = [loop.create_future() for _ in fens]
+    queue: asyncio.Queue = asyncio.Queue()
+    for index, fen in enumerate(fens):
+        if cached[index] is not None:
+            results[index].set_result(cached[index])
+        elif fen is not None:
+            queue.put_nowait((index, fen))
+    
+    async def worker(engine: StockfishEngine):
+        while not queue.empty():
+            index, fen = queue.get_nowait()
+            search = asyncio.ensure_future(asyncio.to_thread(engine.analyze, fen))
+            try:
+                result = await asyncio.shield(search)
+                _cache_search(fen, depth, result)
+                results[index].set_result(result)
+            except asyncio.CancelledError:
+                # The search thread can't be interrupted; wait for it so the
+                # engine is idle by the time the cancelled worker is awaited
+                await asyncio.wait([search])
+                raise
+            except Exception as e:
+                results[index].set_exception(e)
+    
+    workers = [asyncio.create_task(worker(engine)) for engine in engines]
+    return results, workers
+
+
 async def analyze_game(
     task_id: str,
     moves: list[chess.Move],
@@ -128,193 +266,256 @@ async def analyze_game(
 ) -> GameAnalysisResult:
     """
     Analyze a complete chess game move by move.
+    
+    Waits for a free analysis slot first; see analysis_semaphore.
+    """
+    if analysis_semaphore.locked():
+        logger.info(f"Analysis queued: task_id={task_id}")
+    async with analysis_semaphore:
+        return await _analyze_game(task_id, moves, headers, depth, time_per_move_ms, ws_manager)
+
+
+async def _analyze_game(
+    task_id: str,
+    moves: list[chess.Move],
+    headers: dict[str, str],
+    depth: int,
+    time_per_move_ms: int,
+    ws_manager=None
+) -> GameAnalysisResult:
+    """
+    Run the analysis of a game once a slot is available.
     """
     logger.info(f"Starting game analysis: task_id={task_id}, total_moves={len(moves)}, depth={depth}")
     
-    # Initialize Stockfish engine
-    engine = StockfishEngine(depth=depth)
-    
-    # Initialize chess board
+    # Replay the game once to collect every position that needs a search,
+    # and the SAN of every move (san_and_push avoids san()'s extra push/pop)
     board = chess.Board()
+    fens: list[str] = [board.fen()]
+    sans: list[str] = []
+    for move in moves:
+        sans.append(board.san_and_push(move))
+        fens.append(board.fen())
     
-    # Storage for move analyses
-    move_analyses: list[MoveAnalysis] = []
-    white_cpl: list[int] = []
-    black_cpl: list[int] = []
-    
-    # Statistics counters
-    white_stats = {"blunders": 0, "mistakes": 0, "inaccuracies": 0, "brilliant": 0,
-                   "best": 0, "excellent": 0, "great": 0, "good": 0}
-    black_stats = {"blunders": 0, "mistakes": 0, "inaccuracies": 0, "brilliant": 0,
-                   "best": 0, "excellent": 0, "great": 0, "good": 0}
-    
-    # Track previous move classification PER PLAYER (THIS IS CRITICAL!)
-    previous_white_classification = None
-    previous_black_classification = None
-    
-    # ALSO track opponent's previous classification (for punishing errors)
-    previous_white_opponent_classification = None  # Black's last move from White's perspective
-    previous_black_opponent_classification = None  # White's last move from Black's perspective
-    
-    # Analyze each move
-    for i, move in enumerate(moves):
-        try:
-            # Determine which side is moving
-            side = "white" if board.turn == chess.WHITE else "black"
-            
-            # Capture position before move
-            fen_before = board.fen()
-            
-            # Get SAN (Standard Algebraic Notation) and UCI notation
-            san = board.san(move)
-            uci = move.uci()
-            
-            # Get best move from engine at current position
-            best_move_uci = engine.get_best_move(fen_before)
-            if best_move_uci is None:
-                best_move_uci = uci
-            
-            # Determine if current turn is white (for perspective)
-            is_white_turn = (side == "white")
-            
-            # Get evaluation BEFORE the move (from player's perspective)
-            best_eval_raw = get_cp_evaluation(engine, fen_before, perspective_white=True)
-            best_eval_cp = best_eval_raw if is_white_turn else -best_eval_raw
-            
-            # Make the move
-            board.push(move)
-            fen_after = board.fen()
-            
-            # Check for checkmate
-            is_checkmate = board.is_checkmate()
-            
-            # Get evaluation AFTER the move
-            if is_checkmate:
-                # Checkmate: assign maximum evaluation for the winner
-                if is_white_turn:
-                    played_eval_cp_white = 10000
+    # A game can only be checkmated on its final move; that position has no search
+    ends_in_checkmate = board.is_checkmate()
+    
+    # Plies played from the opening book are theory and need no engine search
+    book_line = find_book_line(moves, get_opening_book())
+    if book_line:
+        logger.info(f"task_id={task_id} first {len(book_line)} plies are in the opening book")
+    
+    search_fens: list[Optional[str]] = [
+        None if i < len(book_line) else fen for i, fen in enumerate(fens)
+    ]
+    if ends_in_checkmate:
+        search_fens[-1] = None
+    
+    cached_results = [
+        _get_cached_search(fen, depth) if fen is not None else None for fen in search_fens
+    ]
+    
+    # Search with a pool of Stockfish engines
+    searches = sum(
+        fen is not None and cached is None for fen, cached in zip(search_fens, cached_results)
+    )
+    engines = await _acquire_engines(min(settings.ENGINE_POOL_SIZE, searches), depth)
+    workers: list[asyncio.Task] = []
+    try:
+        position_results, workers = _start_position_workers(engines, search_fens, depth, cached_results)
+        
+        # Initialize chess board
+        board = chess.Board()
+        
+        # Storage for move analyses
+        move_analyses: list[MoveAnalysis] = []
+        white_cpl: list[int] = []
+        black_cpl: list[int] = []
+        
+        # Classification counters, indexed by CLASSIFICATION_INDEX
+        white_counts = [0] * len(CLASSIFICATIONS)
+        black_counts = [0] * len(CLASSIFICATIONS)
+        
+        # Track previous move classification PER PLAYER (THIS IS CRITICAL!)
+        # One side's last move is also the other side's "opponent's previous move"
+        # (for punishing errors), so a single entry per color covers both
+        previous_classification: dict[chess.Color, Optional[str]] = {chess.WHITE: None, chess.BLACK: None}
+        
+        # Every position is searched once. The position after a move is the next
+        # ply's starting position, so its result is carried over as the next "before".
+        # Book positions are not searched: the book move is best and theory is level.
+        if book_line:
+            position_best_move, position_eval_white = book_line[0], 0
+        else:
+            position_best_move, position_eval_white = await position_results[0]
+        
+        # Analyze each move
+        for i, move in enumerate(moves):
+            try:
+                # Determine which side is moving
+                side = "white" if board.turn == chess.WHITE else "black"
+                
+                # Capture position before move
+                fen_before = fens[i]
+                
+                # Get SAN (Standard Algebraic Notation) and UCI notation
+                san = sans[i]
+                uci = move.uci()
+                
+                # Best move at current position (from the search of this position)
+                best_move_uci = position_best_move
+                if best_move_uci is None:
+                    best_move_uci = uci
+                
+                # Determine if current turn is white (for perspective)
+                is_white_turn = (side == "white")
+                
+                # Evaluation BEFORE the move (from player's perspective)
+                best_eval_cp = position_eval_white if is_white_turn else -position_eval_white
+                
+                # Position after the move (from the replay)
+                fen_after = fens[i + 1]
+                
+                # Check for checkmate
+                is_checkmate = ends_in_checkmate and i == len(moves) - 1
+                
+                # Get evaluation AFTER the move
+                if is_checkmate:
+                    # Checkmate: assign maximum evaluation for the winner
+                    if is_white_turn:
+                        played_eval_cp_white = 10000
+                    else:
+                        played_eval_cp_white = -10000
+                    played_eval_cp = 10000
+                    position_best_move = None
+                elif i + 1 < len(book_line):
+                    position_best_move, played_eval_cp_white = book_line[i + 1], 0
+                    played_eval_cp = 0
                 else:
-                    played_eval_cp_white = -10000
-                played_eval_cp = 10000
-            else:
-                played_eval_cp_white = get_cp_evaluation(engine, fen_after, perspective_white=True)
-                played_eval_raw = get_cp_evaluation(engine, fen_after, perspective_white=True)
-                played_eval_cp = played_eval_raw if is_white_turn else -played_eval_raw
-            
-            # Calculate evaluation difference (centipawn loss)
-            eval_diff_cp = max(0, best_eval_cp - played_eval_cp)
-            
-            # SMART OPENING DETECTION: Check if we're still in opening phase
-            # CRITICAL: Pass eval_diff_cp to detect sharp tactical blows
-            is_opening = is_opening_phase(
-                chess.Board(fen_before),  # Board BEFORE the move
-                i, 
-                move, 
-                eval_diff_cp
-            )
-            
-            # === CRITICAL FIX: Get BOTH player's own previous move AND opponent's previous move ===
-            if side == "white":
-                player_previous_classification = previous_white_classification
-                opponent_previous_classification = previous_white_opponent_classification  # Black's last move
-            else:
-                player_previous_classification = previous_black_classification
-                opponent_previous_classification = previous_black_opponent_classification  # White's last move
-            
-            # Classify the move with BOTH contexts
-            classification = classify_move_by_winrate(
-                best_eval_cp=best_eval_cp,
-                played_eval_cp=played_eval_cp,
-                played_move=move,
-                best_move=best_move_uci,
-                is_opening=is_opening,
-                board=chess.Board(fen_before),
-                player_turn_white=is_white_turn,
-                previous_classification=player_previous_classification,
-                opponent_previous_classification=opponent_previous_classification
-            )
-            
-            # Calculate move accuracy
-            move_accuracy = calculate_accuracy([eval_diff_cp])
-            
-            # Create arrow annotations for best move
-            arrows = []
-            if best_move_uci and len(best_move_uci) >= 4:
-                arrows.append(MoveArrow(
-                    from_square=best_move_uci[:2],
-                    to_square=best_move_uci[2:4],
-                    type="best"
-                ))
-            
-            # Create move analysis object
-            move_analysis = MoveAnalysis(
-                index=i,
-                side=side,
-                san=san,
-                uci=uci,
-                fen_before=fen_before,
-                fen_after=fen_after,
-                engine=EngineEvaluation(
-                    best_move=best_move_uci,
-                    played_eval_cp=played_eval_cp_white,
-                    best_eval_cp=best_eval_cp,
-                    eval_diff_cp=eval_diff_cp,
-                    win_probability=compute_win_probability(played_eval_cp)
-                ),
-                classification=classification,
-                accuracy=move_accuracy,
-                opening=is_opening,
-                arrows=arrows
-            )
-            
-            move_analyses.append(move_analysis)
-            
-            # Update statistics
-            if side == "white":
-                white_cpl.append(eval_diff_cp)
-                white_stats[classification] = white_stats.get(classification, 0) + 1
-            else:
-                black_cpl.append(eval_diff_cp)
-                black_stats[classification] = black_stats.get(classification, 0) + 1
-            
-            # === UPDATE BOTH PLAYER-SPECIFIC AND OPPONENT-SPECIFIC CLASSIFICATIONS ===
-            if side == "white":
-                previous_white_classification = classification
-                previous_black_opponent_classification = classification  # White's move from Black's perspective
-            else:
-                previous_black_classification = classification
-                previous_white_opponent_classification = classification  # Black's move from White's perspective
-            
-            # Log move analysis
-            logger.info(
-                f"task_id={task_id} move_index={i} side={side} san={san} "
-                f"best={best_move_uci} played_eval={played_eval_cp} best_eval={best_eval_cp} "
-                f"diff={eval_diff_cp} classification={classification} opening={is_opening} "
-                f"player_prev={player_previous_classification} opp_prev={opponent_previous_classification}"
-            )
-            
-            # Send streaming update via WebSocket
-            if ws_manager:
-                update = StreamingUpdate(
-                    task_id=task_id,
-                    move_index=i,
+                    # One search gives the eval AFTER this move and the best move for the next ply
+                    position_best_move, played_eval_cp_white = await position_results[i + 1]
+                    played_eval_cp = played_eval_cp_white if is_white_turn else -played_eval_cp_white
+                position_eval_white = played_eval_cp_white
+                
+                # Calculate evaluation difference (centipawn loss)
+                eval_diff_cp = max(0, best_eval_cp - played_eval_cp)
+                
+                # === CRITICAL FIX: Get BOTH player's own previous move AND opponent's previous move ===
+                player_previous_classification = previous_classification[board.turn]
+                opponent_previous_classification = previous_classification[not board.turn]
+                
+                if i < len(book_line):
+                    # Book moves are theory by definition and lose nothing
+                    is_opening = True
+                    eval_diff_cp = 0
+                    classification = "theory"
+                else:
+                    # SMART OPENING DETECTION: Check if we're still in opening phase
+                    # CRITICAL: Pass eval_diff_cp to detect sharp tactical blows
+                    is_opening = is_opening_phase(
+                        board,  # Board BEFORE the move (pushed at the end of the ply)
+                        i, 
+                        move, 
+                        eval_diff_cp,
+                        gives_check=san[-1] in "+#"
+                    )
+                    
+                    # Classify the move with BOTH contexts
+                    classification = classify_move_by_winrate(
+                        best_eval_cp=best_eval_cp,
+                        played_eval_cp=played_eval_cp,
+                        played_move=move,
+                        best_move=best_move_uci,
+                        is_opening=is_opening,
+                        board=board,
+                        player_turn_white=is_white_turn,
+                        previous_classification=player_previous_classification,
+                        opponent_previous_classification=opponent_previous_classification
+                    )
+                
+                # Calculate move accuracy
+                move_accuracy = calculate_move_accuracy(eval_diff_cp)
+                
+                # Create arrow annotations for best move
+                arrows = []
+                if best_move_uci and len(best_move_uci) >= 4:
+                    arrows.append(MoveArrow(
+                        from_square=best_move_uci[:2],
+                        to_square=best_move_uci[2:4],
+                        type="best"
+                    ))
+                
+                # Create move analysis object
+                move_analysis = MoveAnalysis(
+                    index=i,
+                    side=side,
+                    san=san,
+                    uci=uci,
+                    fen_before=fen_before,
+                    fen_after=fen_after,
+                    engine=EngineEvaluation(
+                        best_move=best_move_uci,
+                        played_eval_cp=played_eval_cp_white,
+                        best_eval_cp=best_eval_cp,
+                        eval_diff_cp=eval_diff_cp,
+                        win_probability=compute_win_probability(played_eval_cp)
+                    ),
                     classification=classification,
-                    played_eval_cp=played_eval_cp,
-                    best_eval_cp=best_eval_cp,
-                    diff_cp=eval_diff_cp,
-                    best_move=best_move_uci,
-                    fen=fen_after,
-                    progress=round((i + 1) / len(moves), 3)
+                    accuracy=move_accuracy,
+                    opening=is_opening,
+                    arrows=arrows
                 )
-                await ws_manager.broadcast(task_id, update.model_dump())
-                logger.info(f"Streaming move {i} task_id={task_id}")
-            
-            # Small delay to prevent blocking
-            await asyncio.sleep(0.01)
+                
+                move_analyses.append(move_analysis)
+                
+                # Update statistics
+                if side == "white":
+                    white_cpl.append(eval_diff_cp)
+                    white_counts[CLASSIFICATION_INDEX[classification]] += 1
+                else:
+                    black_cpl.append(eval_diff_cp)
+                    black_counts[CLASSIFICATION_INDEX[classification]] += 1
+                
+                # === UPDATE PLAYER'S CLASSIFICATION (ALSO THE OPPONENT'S NEXT opp_prev) ===
+                previous_classification[board.turn] = classification
+                
+                # Log move analysis (arguments are only formatted if INFO is enabled)
+                logger.info(
+                    "task_id={} move_index={} side={} san={} best={} played_eval={} best_eval={} "
+                    "diff={} classification={} opening={} player_prev={} opp_prev={}",
+                    task_id, i, side, san, best_move_uci, played_eval_cp, best_eval_cp,
+                    eval_diff_cp, classification, is_opening,
+                    player_previous_classification, opponent_previous_classification
+                )
+                
+                # Send streaming update via WebSocket. Built as a plain dict with the
+                # fields of StreamingUpdate; the values were already validated above.
+                if ws_manager:
+                    ws_manager.queue_update(task_id, {
+                        "task_id": task_id,
+                        "move_index": i,
+                        "classification": classification,
+                        "played_eval_cp": played_eval_cp,
+                        "best_eval_cp": best_eval_cp,
+                        "diff_cp": eval_diff_cp,
+                        "best_move": best_move_uci,
+                        "fen": fen_after,
+                        "progress": round((i + 1) / len(moves), 3)
+                    })
+                    logger.debug("Streaming move {} task_id={}", i, task_id)
+                
+            except Exception as e:
+                logger.error(f"Error analyzing move {i}: {str(e)}")
             
-        except Exception as e:
-            logger.error(f"Error analyzing move {i}: {str(e)}")
-            continue
+            # Advance the live board; done outside the try so it stays in sync on errors
+            board.push(move)
+    finally:
+        # Stop searches no ply will read (e.g. after an error or cancellation);
+        # workers let an in-progress search finish, so the engines come back idle
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        _release_engines(engines)
     
     # Calculate overall accuracy for each player
     white_accuracy = calculate_accuracy(white_cpl) if white_cpl else 100.0
@@ -324,28 +525,8 @@ async def analyze_game(
     
     # Create game summary
     summary = GameSummary(
-        white=PlayerSummary(
-            accuracy=white_accuracy,
-            blunders=white_stats.get("blunder", 0),
-            mistakes=white_stats.get("mistake", 0),
-            inaccuracies=white_stats.get("inaccuracy", 0),
-            brilliant=white_stats.get("brilliant", 0),
-            best=white_stats.get("best", 0),
-            excellent=white_stats.get("excellent", 0),
-            great=white_stats.get("great", 0),
-            good=white_stats.get("good", 0)
-        ),
-        black=PlayerSummary(
-            accuracy=black_accuracy,
-            blunders=black_stats.get("blunder", 0),
-            mistakes=black_stats.get("mistake", 0),
-            inaccuracies=black_stats.get("inaccuracy", 0),
-            brilliant=black_stats.get("brilliant", 0),
-            best=black_stats.get("best", 0),
-            excellent=black_stats.get("excellent", 0),
-            great=black_stats.get("great", 0),
-            good=black_stats.get("good", 0)
-        )
+        white=_player_summary(white_accuracy, white_counts),
+        black=_player_summary(black_accuracy, black_counts)
     )
     
     # Create complete game analysis result
@@ -356,26 +537,49 @@ async def analyze_game(
         summary=summary
     )
     
-    # Store result in memory cache
-    analysis_storage[task_id] = result
+    # Store result for retrieval via the API
+    analysis_storage.put(task_id, result)
     
     logger.info(f"Analysis complete: task_id={task_id}")
     
-    # Send completion message via WebSocket
+    # Send completion message via WebSocket, after any queued move updates
     if ws_manager:
+        await ws_manager.flush(task_id)
         completion = CompletionMessage(
             task_id=task_id,
             status="complete",
             total_moves=len(moves)
         )
-        await ws_manager.broadcast(task_id, completion.model_dump())
+        await ws_manager.broadcast(task_id, completion.model_dump_json())
         logger.info(f"Sent completion message for task_id={task_id}")
     
     return result
 
 
+def _player_summary(accuracy: float, counts: list[int]) -> PlayerSummary:
+    """Build a player summary from per-classification counters."""
+    return PlayerSummary(
+        accuracy=accuracy,
+        blunders=counts[CLASSIFICATION_INDEX["blunder"]],
+        mistakes=counts[CLASSIFICATION_INDEX["mistake"]],
+        inaccuracies=counts[CLASSIFICATION_INDEX["inaccuracy"]],
+        brilliant=counts[CLASSIFICATION_INDEX["brilliant"]],
+        best=counts[CLASSIFICATION_INDEX["best"]],
+        excellent=counts[CLASSIFICATION_INDEX["excellent"]],
+        great=counts[CLASSIFICATION_INDEX["great"]],
+        good=counts[CLASSIFICATION_INDEX["good"]]
+    )
+
+
 def get_analysis_result(task_id: str) -> Optional[GameAnalysisResult]:
     """
     Retrieve cached analysis result by task ID.
     """
-    return analysis_storage.get(task_id)
\ No newline at end of file
+    return analysis_storage.get(task_id)
+
+
+def get_analysis_result_json(task_id: str) -> Optional[bytes]:
+    """
+    Retrieve cached analysis result by task ID, pre-serialized as JSON.
+    """
+    return analysis_storage.get_json(task_id)
\ No newline at end of file
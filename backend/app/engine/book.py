@@ -0,0 +1,62 @@
+"""Polyglot opening book lookups."""
+
+import chess
+import chess.polyglot
+from functools import lru_cache
+from typing import Optional
+from ..config import settings
+from ..utils.logging import logger
+
+# Opening detection never extends past this ply, so neither does the book
+MAX_BOOK_PLIES = 20
+
+
+@lru_cache(maxsize=1)
+def get_opening_book() -> Optional[chess.polyglot.MemoryMappedReader]:
+    """
+    Open the configured Polyglot book once per process.
+
+    Returns:
+        Book reader, or None if no book is configured or it cannot be opened
+    """
+    if not settings.OPENING_BOOK_PATH:
+        return None
+
+    try:
+        book = chess.polyglot.open_reader(settings.OPENING_BOOK_PATH)
+        logger.info(f"Opening book loaded: {settings.OPENING_BOOK_PATH}")
+        return book
+    except OSError as e:
+        logger.error(f"Could not open opening book at {settings.OPENING_BOOK_PATH}: {str(e)}")
+        return None
+
+
+def find_book_line(
+    moves: list[chess.Move],
+    book: Optional[chess.polyglot.MemoryMappedReader]
+) -> list[str]:
+    """
+    Follow the game through the opening book.
+
+    Args:
+        moves: Moves of the game from the starting position
+        book: Polyglot book reader (None disables the lookup)
+
+    Returns:
+        For each leading ply whose played move is in the book, the book's
+        main (highest weight) move in UCI. Stops at the first move that
+        leaves the book.
+    """
+    if book is None:
+        return []
+
+    board = chess.Board()
+    line: list[str] = []
+    for move in moves[:MAX_BOOK_PLIES]:
+        entries = list(book.find_all(board))
+        if not any(entry.move == move for entry in entries):
+            break
+        line.append(max(entries, key=lambda entry: entry.weight).move.uci())
+        board.push(move)
+
+    return line
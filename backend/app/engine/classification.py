@@ -1,5 +1,7 @@
 import chess
-from typing import Literal, Optional
+import math
+from bisect import bisect_left
+from typing import Literal, Optional, get_args
 from ..config import settings
 from ..utils.logging import logger
 
@@ -9,6 +11,27 @@ MoveClassification = Literal[
     "brilliant", "inaccuracy", "mistake", "blunder"
 ]
 
+# Small-int encoding of classifications, e.g. for per-player counters
+CLASSIFICATIONS: tuple[str, ...] = get_args(MoveClassification)
+CLASSIFICATION_INDEX: dict[str, int] = {name: i for i, name in enumerate(CLASSIFICATIONS)}
+
+# Upper bounds (inclusive) of each loss band and the label for each band;
+# the label past the last bound applies to anything larger
+WIN_LOSS_BANDS = (2.5, 8.0, 15.0, 25.0)  # win-rate loss in %
+WIN_LOSS_LABELS = ("excellent", "good", "inaccuracy", "mistake", "blunder")
+
+GARBAGE_TIME_BANDS = (3.0, 10.0)  # win-rate loss in %, lenient
+GARBAGE_TIME_LABELS = ("excellent", "good", "inaccuracy")
+
+CP_LOSS_BANDS = (
+    settings.THRESHOLD_BEST,
+    settings.THRESHOLD_EXCELLENT,
+    settings.THRESHOLD_GOOD,
+    settings.THRESHOLD_INACCURACY,
+    settings.THRESHOLD_MISTAKE
+)
+CP_LOSS_LABELS = ("best", "excellent", "good", "inaccuracy", "mistake", "blunder")
+
 
 def classify_move_by_winrate(
     best_eval_cp: int,
@@ -34,13 +57,21 @@ def classify_move_by_winrate(
     - Position must improve OR stay equal (minimal eval loss)
     - Even if not #1 engine choice, can still be brilliant if it's a strong sacrifice
     """
+    # Fast path: outside the opening, the engine's top move can only be brilliant,
+    # great or best. Rule out the first two cheaply before any board work.
+    if (
+        not is_opening
+        and played_move.uci() == best_move
+        and previous_classification != "brilliant"
+        and opponent_previous_classification not in ("mistake", "blunder", "inaccuracy")
+        and (board is None or not _may_be_brilliant(played_move, board))
+    ):
+        return "best"
+    
     # Check for checkmate
-    if board:
-        board_after = board.copy()
-        board_after.push(played_move)
-        if board_after.is_checkmate():
-            logger.info(f"Checkmate detected: {played_move} - classifying as 'best'")
-            return "best"
+    if board and _gives_checkmate(board, played_move):
+        logger.info("Checkmate detected: {} - classifying as 'best'", played_move)
+        return "best"
     
     # Determine if this is the best move
     played_move_uci = played_move.uci()
@@ -58,9 +89,10 @@ def classify_move_by_winrate(
     is_garbage_time = abs(best_eval_cp) > 700
     
     logger.info(
-        f"Classifying move {played_move}: is_best={is_best_move}, is_opening={is_opening}, "
-        f"win_loss={win_loss_pct:.2f}%, eval_diff={eval_diff_cp}cp, "
-        f"your_prev={previous_classification}, opp_prev={opponent_previous_classification}"
+        "Classifying move {}: is_best={}, is_opening={}, win_loss={:.2f}%, eval_diff={}cp, "
+        "your_prev={}, opp_prev={}",
+        played_move, is_best_move, is_opening, win_loss_pct, eval_diff_cp,
+        previous_classification, opponent_previous_classification
     )
     
     # === STEP 1: ALWAYS CHECK FOR BRILLIANT FIRST ===
@@ -76,14 +108,14 @@ def classify_move_by_winrate(
             # Brilliant moves can lose some eval but not too much
             if eval_diff_cp <= 50:  # Less than 0.5 pawns worse
                 logger.info(
-                    f"⭐ BRILLIANT move detected: {played_move} - {brilliant_type} "
-                    f"(eval_diff={eval_diff_cp}cp)"
+                    "⭐ BRILLIANT move detected: {} - {} (eval_diff={}cp)",
+                    played_move, brilliant_type, eval_diff_cp
                 )
                 return "brilliant"
             else:
                 logger.info(
-                    f"Sacrifice pattern detected but eval loss too high "
-                    f"({eval_diff_cp}cp) - not brilliant"
+                    "Sacrifice pattern detected but eval loss too high ({}cp) - not brilliant",
+                    eval_diff_cp
                 )
     
     # === STEP 2: CHECK FOR GREAT (ONLY FOR TOP ENGINE MOVES, NOT IN OPENING) ===
@@ -96,7 +128,8 @@ def classify_move_by_winrate(
         # Scenario 2: After OPPONENT's mistake/miss/blunder, YOUR top engine move = GREAT
         if opponent_previous_classification in ["mistake", "blunder", "inaccuracy"]:
             logger.info(
-                f"✨ Top engine move after OPPONENT's {opponent_previous_classification} = GREAT (punishing)"
+                "✨ Top engine move after OPPONENT's {} = GREAT (punishing)",
+                opponent_previous_classification
             )
             return "great"
     
@@ -117,8 +150,8 @@ def classify_move_by_winrate(
         # Allow slightly suboptimal moves to be "theory"
         if win_loss_pct <= 2.0 and eval_diff_cp <= 30:
             logger.info(
-                f"📖 Non-best move in opening = THEORY "
-                f"(win_loss={win_loss_pct:.2f}%, eval_diff={eval_diff_cp}cp)"
+                "📖 Non-best move in opening = THEORY (win_loss={:.2f}%, eval_diff={}cp)",
+                win_loss_pct, eval_diff_cp
             )
             return "theory"
     
@@ -131,40 +164,16 @@ def classify_move_by_winrate(
     
     # Garbage time: be more lenient
     if is_garbage_time:
-        if win_loss_pct <= 3.0:
-            return "excellent"
-        elif win_loss_pct <= 10.0:
-            return "good"
-        else:
-            return "inaccuracy"
-    
-    # EXCELLENT = Playable alternative (not best, but doesn't harm position)
-    # Very minimal win-rate loss (up to 2.5%)
-    if win_loss_pct <= 2.5:
-        logger.info(
-            f"Move {played_move} is EXCELLENT (playable alternative, "
-            f"win_loss={win_loss_pct:.2f}%)"
-        )
-        return "excellent"
+        return GARBAGE_TIME_LABELS[bisect_left(GARBAGE_TIME_BANDS, win_loss_pct)]
     
+    # EXCELLENT = Playable alternative (not best, but doesn't harm position), up to 2.5% loss
     # GOOD = 2.5% - 8% loss
-    if win_loss_pct <= 8.0:
-        logger.info(f"Move {played_move} is GOOD (win_loss={win_loss_pct:.2f}%)")
-        return "good"
-    
     # INACCURACY = 8% - 15% loss
-    if win_loss_pct <= 15.0:
-        logger.info(f"Move {played_move} is INACCURACY (win_loss={win_loss_pct:.2f}%)")
-        return "inaccuracy"
-    
     # MISTAKE = 15% - 25% loss
-    if win_loss_pct <= 25.0:
-        logger.info(f"Move {played_move} is MISTAKE (win_loss={win_loss_pct:.2f}%)")
-        return "mistake"
-    
     # BLUNDER = >25% loss
-    logger.info(f"Move {played_move} is BLUNDER (win_loss={win_loss_pct:.2f}%)")
-    return "blunder"
+    classification = WIN_LOSS_LABELS[bisect_left(WIN_LOSS_BANDS, win_loss_pct)]
+    logger.info("Move {} is {} (win_loss={:.2f}%)", played_move, classification.upper(), win_loss_pct)
+    return classification
 
 
 def _check_brilliant_patterns(
@@ -196,80 +205,114 @@ def _check_brilliant_patterns(
     if piece is None:
         return None
     
-    piece_value = _get_piece_value(piece.piece_type)
+    piece_value = PIECE_VALUES[piece.piece_type]
     is_capture = board.is_capture(move)
+    captured_piece = board.piece_at(move.to_square) if is_capture else None
     
-    # Create board after move to analyze
-    board_after = board.copy()
-    board_after.push(move)
+    # A capture is only a sacrifice if it gives up more material than it wins
+    # (en passant captures a pawn that isn't on the destination square)
+    if is_capture and (
+        captured_piece is None or piece_value <= PIECE_VALUES[captured_piece.piece_type]
+    ):
+        return None
     
-    # === PATTERN 1: REAL SACRIFICE (capturing with more valuable piece) ===
-    if is_capture:
-        captured_piece = board.piece_at(move.to_square)
-        if captured_piece:
-            captured_value = _get_piece_value(captured_piece.piece_type)
-            
-            # Check if we're giving up more material (e.g., Knight takes pawn)
-            if piece_value > captured_value:
-                # Now check: Can our piece ACTUALLY be recaptured?
-                can_be_recaptured = board_after.is_attacked_by(
-                    not board.turn, move.to_square
-                )
-                
-                if can_be_recaptured:
-                    # Count attackers vs defenders AFTER the capture
-                    attackers = list(board_after.attackers(not board.turn, move.to_square))
-                    defenders = list(board_after.attackers(board.turn, move.to_square))
-                    
-                    # Material will be lost if attackers > defenders
-                    net_material_loss = piece_value - captured_value
-                    
-                    # CRITICAL: We lose material, but position stays strong
-                    if len(attackers) > len(defenders):
-                        logger.info(
-                            f"⭐ REAL SACRIFICE PATTERN: {piece.symbol()}({piece_value}) x "
-                            f"{captured_piece.symbol()}({captured_value}) can be recaptured. "
-                            f"Net loss: {net_material_loss} material. "
-                            f"Attackers: {len(attackers)}, Defenders: {len(defenders)}. "
-                            f"Eval: {eval_before} → {eval_after} (diff: {eval_diff_cp}cp)"
-                        )
-                        return f"Tactical sacrifice: losing {net_material_loss} material for attack"
-    
-    # === PATTERN 2: HANGING PIECE SACRIFICE (non-capture to attacked square) ===
-    if not is_capture:
-        # Check if destination square is attacked by opponent
-        is_attacked = board_after.is_attacked_by(not board.turn, move.to_square)
+    # Both patterns need the destination to be attacked after the move
+    if not _may_be_brilliant(move, board):
+        return None
+    
+    us = board.turn
+    
+    # Analyze the position after the move on the board itself; the queries
+    # below are read-only, so it is restored with pop() instead of copied
+    board.push(move)
+    try:
+        # Both patterns need the piece to be capturable: more attackers than
+        # defenders on its new square (so it is attacked at all)
+        attackers = chess.popcount(board.attackers_mask(not us, move.to_square))
+        defenders = chess.popcount(board.attackers_mask(us, move.to_square))
+        if attackers <= defenders:
+            return None
         
-        if is_attacked:
-            # Count attackers and defenders
-            attackers = list(board_after.attackers(not board.turn, move.to_square))
-            defenders = list(board_after.attackers(board.turn, move.to_square))
+        # === PATTERN 1: REAL SACRIFICE (capturing with more valuable piece) ===
+        if is_capture:
+            captured_value = PIECE_VALUES[captured_piece.piece_type]
             
-            # If more attackers than defenders, piece is hanging (can be captured)
-            if len(attackers) > len(defenders):
-                logger.info(
-                    f"⭐ HANGING PIECE PATTERN: {piece.symbol()} to {chess.square_name(move.to_square)}. "
-                    f"Attackers: {len(attackers)}, Defenders: {len(defenders)}. "
-                    f"Risking {piece_value} material. "
-                    f"Eval: {eval_before} → {eval_after} (diff: {eval_diff_cp}cp)"
-                )
-                return f"Bold piece placement on attacked square (risking {piece_value} material)"
+            # Material will be lost when the piece is recaptured
+            net_material_loss = piece_value - captured_value
+            
+            # CRITICAL: We lose material, but position stays strong
+            logger.info(
+                "⭐ REAL SACRIFICE PATTERN: {}({}) x {}({}) can be recaptured. "
+                "Net loss: {} material. Attackers: {}, Defenders: {}. "
+                "Eval: {} → {} (diff: {}cp)",
+                piece, piece_value, captured_piece, captured_value,
+                net_material_loss, attackers, defenders,
+                eval_before, eval_after, eval_diff_cp
+            )
+            return f"Tactical sacrifice: losing {net_material_loss} material for attack"
+        
+        # === PATTERN 2: HANGING PIECE SACRIFICE (non-capture to attacked square) ===
+        logger.info(
+            "⭐ HANGING PIECE PATTERN: {} to {}. Attackers: {}, Defenders: {}. "
+            "Risking {} material. Eval: {} → {} (diff: {}cp)",
+            piece, chess.SQUARE_NAMES[move.to_square], attackers, defenders,
+            piece_value, eval_before, eval_after, eval_diff_cp
+        )
+        return f"Bold piece placement on attacked square (risking {piece_value} material)"
+    finally:
+        board.pop()
+
+
+def _gives_checkmate(board: chess.Board, move: chess.Move) -> bool:
+    """
+    Check whether `move` delivers checkmate.
     
-    # No brilliant pattern detected
-    return None
+    Only checking moves can mate, so everything else is ruled out by
+    gives_check() without touching the board; checks are pushed and popped
+    on `board` itself rather than on a copy.
+    """
+    if not board.gives_check(move):
+        return False
+    board.push(move)
+    try:
+        return board.is_checkmate()
+    finally:
+        board.pop()
+
+
+def _may_be_brilliant(move: chess.Move, board: chess.Board) -> bool:
+    """
+    Cheap necessary condition for _check_brilliant_patterns.
+    
+    Both brilliant patterns need the moved piece to land on a square the
+    opponent attacks, which can be read from the attack bitboards with the
+    post-move occupancy without copying the board.
+    """
+    if board.is_en_passant(move) or board.is_castling(move):
+        # These also move a second piece; leave them to the full check
+        return True
+    occupied = (board.occupied & ~chess.BB_SQUARES[move.from_square]) | chess.BB_SQUARES[move.to_square]
+    return bool(board.attackers_mask(not board.turn, move.to_square, occupied))
+
+
+# Standard material values indexed by piece type (index 0 is unused)
+PIECE_VALUES = (0, 1, 3, 3, 5, 9, 0)  # -, pawn, knight, bishop, rook, queen, king
 
 
 def _get_piece_value(piece_type: int) -> int:
     """Get standard material value for a piece."""
-    values = {
-        chess.PAWN: 1,
-        chess.KNIGHT: 3,
-        chess.BISHOP: 3,
-        chess.ROOK: 5,
-        chess.QUEEN: 9,
-        chess.KING: 0
-    }
-    return values.get(piece_type, 0)
+    return PIECE_VALUES[piece_type]
+
+
+def _is_brilliant_candidate(
+    move: chess.Move,
+    board: chess.Board,
+    eval_before: int,
+    eval_after: int,
+    diff_cp: int
+) -> bool:
+    """Check whether a move shows a brilliant (sacrifice/hanging piece) pattern."""
+    return _check_brilliant_patterns(move, board, eval_before, eval_after, diff_cp) is not None
 
 
 def classify_move(
@@ -282,12 +325,8 @@ def classify_move(
     eval_after: int = 0
 ) -> MoveClassification:
     """Legacy classification function (not used in main flow)."""
-    if board:
-        board_after = board.copy()
-        board_after.push(played_move)
-        
-        if board_after.is_checkmate():
-            return "best"
+    if board and _gives_checkmate(board, played_move):
+        return "best"
     
     played_move_uci = played_move.uci()
     is_best_move = (played_move_uci == best_move)
@@ -309,18 +348,7 @@ def classify_move(
     if is_opening and diff_cp <= 30:
         return "theory"
     
-    if diff_cp <= settings.THRESHOLD_BEST:
-        return "best"
-    elif diff_cp <= settings.THRESHOLD_EXCELLENT:
-        return "excellent"
-    elif diff_cp <= settings.THRESHOLD_GOOD:
-        return "good"
-    elif diff_cp <= settings.THRESHOLD_INACCURACY:
-        return "inaccuracy"
-    elif diff_cp <= settings.THRESHOLD_MISTAKE:
-        return "mistake"
-    else:
-        return "blunder"
+    return CP_LOSS_LABELS[bisect_left(CP_LOSS_BANDS, diff_cp)]
 
 
 def calculate_accuracy(centipawn_losses: list[int], k_factor: int = None) -> float:
@@ -330,7 +358,6 @@ def calculate_accuracy(centipawn_losses: list[int], k_factor: int = None) -> flo
     
     k = k_factor or settings.ACCURACY_K_FACTOR
     
-    import math
     total_accuracy = 0.0
     for cpl in centipawn_losses:
         move_accuracy = 100.0 * math.exp(-abs(cpl) / k)
@@ -340,9 +367,34 @@ def calculate_accuracy(centipawn_losses: list[int], k_factor: int = None) -> flo
     return round(avg_accuracy, 2)
 
 
+def calculate_move_accuracy(centipawn_loss: int, k_factor: int = None) -> float:
+    """
+    Calculate the accuracy of a single move.
+    
+    Same as calculate_accuracy([centipawn_loss]), without building a list
+    and looping for every move.
+    """
+    k = k_factor or settings.ACCURACY_K_FACTOR
+    return round(100.0 * math.exp(-abs(centipawn_loss) / k), 2)
+
+
 def compute_win_probability(cp: int) -> float:
     """Convert centipawn evaluation to win probability."""
-    import math
+    if type(cp) is int:
+        index = max(-WIN_PROBABILITY_RANGE, min(WIN_PROBABILITY_RANGE, cp)) + WIN_PROBABILITY_RANGE
+        return _WIN_PROBABILITY_TABLE[index]
+    return _win_probability(cp)
+
+
+def _win_probability(cp: float) -> float:
     clamped_cp = max(-10000, min(10000, cp))
     win_pct = 50 + 50 * (2 / (1 + math.exp(-0.004 * clamped_cp)) - 1)
-    return round(win_pct / 100, 3)
\ No newline at end of file
+    return round(win_pct / 100, 3)
+
+
+# Beyond ±1901cp the rounded win probability is already 0.0 / 1.0, so integer
+# evaluations are looked up in a table of this range instead of calling exp()
+WIN_PROBABILITY_RANGE = 2000
+_WIN_PROBABILITY_TABLE: tuple[float, ...] = tuple(
+    _win_probability(cp) for cp in range(-WIN_PROBABILITY_RANGE, WIN_PROBABILITY_RANGE + 1)
+)
\ No newline at end of file
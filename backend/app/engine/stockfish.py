@@ -1,6 +1,6 @@
 import chess
 from stockfish import Stockfish
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from ..config import settings
 from ..utils.logging import logger
 
@@ -9,7 +9,7 @@ class StockfishEngine:
     
     def __init__(
         self,
-        path: Optional[str] = r"C:\Users\Muhammad Fezan\Downloads\stockfish-windows-x86-64-avx2\stockfish\stockfish-windows-x86-64-avx2.exe",
+        path: Optional[str] = None,
         depth: Optional[int] = 5,
         threads: Optional[int] = 4,
         hash_mb: Optional[int] = 256,
@@ -65,6 +65,51 @@ class StockfishEngine:
             logger.error(f"Get best move failed for FEN {fen}: {str(e)}")
             return None
     
+    def new_game(self) -> None:
+        """Send `ucinewgame` to clear the transposition table before a new game."""
+        self.engine.set_fen_position(chess.STARTING_FEN, send_ucinewgame_token=True)
+    
+    def set_depth(self, depth: int) -> None:
+        """Change the search depth used by later searches."""
+        self.depth = depth
+        self.engine.set_depth(depth)
+    
+    def is_running(self) -> bool:
+        """Check that the Stockfish process still responds, with a cheap `d` round trip."""
+        try:
+            self.engine.get_fen_position()
+            return True
+        except Exception as e:
+            logger.warning(f"Stockfish process is not responding: {str(e)}")
+            return False
+    
+    def analyze(self, fen: str) -> Tuple[Optional[str], int]:
+        """
+        Search a position once and return both the best move and its evaluation.
+        
+        A single `go depth N` yields `bestmove` plus the final `info ... score`
+        line, so there is no need for a second search just to get the eval.
+        
+        The position is set without `ucinewgame`, so the transposition table
+        built while searching earlier plies of the same game is reused. Call
+        new_game() before analyzing an unrelated game.
+        
+        Returns:
+            Tuple of (best move in UCI or None, centipawns from White's perspective)
+        """
+        try:
+            self.engine.set_fen_position(fen, send_ucinewgame_token=False)
+            best_move = self.engine.get_best_move()
+            eval_dict = _parse_score(self.engine.info)
+            cp = convert_mate_to_cp(eval_dict)
+            # Stockfish reports the score relative to the side to move
+            if fen.split(" ")[1] == "b":
+                cp = -cp
+            return best_move, cp
+        except Exception as e:
+            logger.error(f"Analysis failed for FEN {fen}: {str(e)}")
+            return None, 0
+    
     def is_available(self) -> bool:
         try:
             self.engine.set_fen_position(chess.STARTING_FEN)
@@ -74,6 +119,15 @@ class StockfishEngine:
             return False
 
 
+def _parse_score(info: str) -> Dict[str, Any]:
+    """Extract the score from a UCI `info` line as {"type": "cp"|"mate", "value": int}."""
+    tokens = info.split(" ")
+    for n, token in enumerate(tokens):
+        if token == "score" and n + 2 < len(tokens):
+            return {"type": tokens[n + 1], "value": int(tokens[n + 2])}
+    return {"type": "cp", "value": 0}
+
+
 def convert_mate_to_cp(eval_dict: Dict[str, Any]) -> int:
     if eval_dict["type"] == "mate":
         mate_in = eval_dict["value"]
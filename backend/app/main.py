@@ -1,16 +1,31 @@
 """Main FastAPI application for HoneyPotEngine."""
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .api.routes import router
+from .api.routes import router, analysis_tasks, check_engine_health
 from .config import settings
 from .utils.logging import logger
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start the health-check engine on startup and cancel analyses still
+    running when the server shuts down.
+    """
+    await check_engine_health()
+    yield
+    for task in list(analysis_tasks):
+        task.cancel()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="HoneyPotEngine",
     description="Chess Game Review System - Backend API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
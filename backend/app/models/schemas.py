@@ -14,7 +14,7 @@ class AnalysisRequest(BaseModel):
 class AnalysisStartResponse(BaseModel):
     """Response model for analysis initiation."""
     task_id: str
-    status: Literal["started"]
+    status: Literal["started", "queued"]
     total_moves: int
 
 
@@ -2,13 +2,14 @@
 
 import sys
 from loguru import logger
+from ..config import settings
 
 # Configure logger
 logger.remove()  # Remove default handler
 logger.add(
     sys.stdout,
     format="[{time:YYYY-MM-DD HH:mm:ss}] {level} {name} :: {message}",
-    level="INFO"
+    level=settings.LOG_LEVEL
 )
 
 __all__ = ["logger"]
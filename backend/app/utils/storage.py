@@ -0,0 +1,119 @@
+"""Storage backends for completed analysis results."""
+
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Type
+from pydantic import BaseModel
+from ..utils.logging import logger
+
+
+class StorageBackend(ABC):
+    """Key-value store for analysis results, keyed by task ID."""
+    
+    @abstractmethod
+    def put(self, task_id: str, result: BaseModel) -> None:
+        ...
+    
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[BaseModel]:
+        ...
+    
+    @abstractmethod
+    def get_json(self, task_id: str) -> Optional[bytes]:
+        """Return the result already serialized as JSON, ready to send."""
+        ...
+
+
+class MemoryStorage(StorageBackend):
+    """
+    In-process LRU store.
+    
+    Holds at most `maxsize` results; the least recently used one is evicted
+    when a new result is stored. Each result is serialized to JSON once on
+    insert so repeated reads don't re-encode the model.
+    
+    Safe to use from worker threads: every read also reorders the LRU, so all
+    access goes through a lock.
+    """
+    
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._results: OrderedDict[str, tuple[BaseModel, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def put(self, task_id: str, result: BaseModel) -> None:
+        entry = (result, result.model_dump_json(by_alias=True).encode())
+        with self._lock:
+            self._results[task_id] = entry
+            self._results.move_to_end(task_id)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+    
+    def _lookup(self, task_id: str) -> Optional[tuple[BaseModel, bytes]]:
+        with self._lock:
+            entry = self._results.get(task_id)
+            if entry is not None:
+                self._results.move_to_end(task_id)
+            return entry
+    
+    def get(self, task_id: str) -> Optional[BaseModel]:
+        entry = self._lookup(task_id)
+        return entry[0] if entry is not None else None
+    
+    def get_json(self, task_id: str) -> Optional[bytes]:
+        entry = self._lookup(task_id)
+        return entry[1] if entry is not None else None
+
+
+class RedisStorage(StorageBackend):
+    """
+    Redis-backed store shared by all server workers.
+    
+    Results are stored as JSON with a TTL and parsed back into `model` on read.
+    """
+    
+    def __init__(self, url: str, model: Type[BaseModel], ttl_seconds: int = 3600):
+        import redis
+        
+        self.client = redis.Redis.from_url(url)
+        self.model = model
+        self.ttl_seconds = ttl_seconds
+    
+    def put(self, task_id: str, result: BaseModel) -> None:
+        self.client.set(f"analysis:{task_id}", result.model_dump_json(by_alias=True), ex=self.ttl_seconds)
+    
+    def get(self, task_id: str) -> Optional[BaseModel]:
+        data = self.get_json(task_id)
+        if data is None:
+            return None
+        return self.model.model_validate_json(data)
+    
+    def get_json(self, task_id: str) -> Optional[bytes]:
+        return self.client.get(f"analysis:{task_id}")
+
+
+def create_storage(
+    model: Type[BaseModel],
+    redis_url: Optional[str] = None,
+    maxsize: int = 128,
+    ttl_seconds: int = 3600
+) -> StorageBackend:
+    """
+    Create the storage backend for analysis results.
+    
+    Args:
+        model: Result model, used to parse results read back from Redis
+        redis_url: Redis connection URL; in-process storage is used if not set
+        maxsize: Maximum number of results kept by in-process storage
+        ttl_seconds: Expiry for results stored in Redis
+    
+    Returns:
+        Storage backend instance
+    """
+    if redis_url:
+        logger.info("Using Redis analysis storage")
+        return RedisStorage(redis_url, model, ttl_seconds)
+    
+    logger.info(f"Using in-memory analysis storage (maxsize={maxsize})")
+    return MemoryStorage(maxsize)
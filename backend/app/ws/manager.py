@@ -1,10 +1,20 @@
 """WebSocket connection manager."""
 
 from fastapi import WebSocket
-from typing import Dict, List
+from typing import Dict, List, Union
+import asyncio
 import json
 from ..utils.logging import logger
 
+# How often queued streaming updates are flushed to clients (seconds)
+FLUSH_INTERVAL_S = 0.05
+
+# Clients that take longer than this to accept a message are dropped (seconds)
+SEND_TIMEOUT_S = 1.0
+
+# Compact JSON encoder shared by all broadcasts
+_dumps = json.JSONEncoder(separators=(",", ":")).encode
+
 
 class WSManager:
     """Manage WebSocket connections for real-time analysis updates."""
@@ -12,6 +22,10 @@ class WSManager:
     def __init__(self):
         # Map task_id -> list of active connections
         self.active_connections: Dict[str, List[WebSocket]] = {}
+        # Map task_id -> streaming updates waiting for the next flush
+        self.pending_updates: Dict[str, List[dict]] = {}
+        # Map task_id -> running drain loop
+        self.drain_tasks: Dict[str, asyncio.Task] = {}
     
     async def connect(self, task_id: str, websocket: WebSocket):
         """Accept and store a new WebSocket connection."""
@@ -30,22 +44,73 @@ class WSManager:
                 del self.active_connections[task_id]
         logger.info(f"WebSocket disconnected for task_id={task_id}")
     
-    async def broadcast(self, task_id: str, message: dict):
-        """Broadcast a message to all connections for a task."""
+    async def broadcast(self, task_id: str, message: Union[dict, str]):
+        """
+        Broadcast a message to all connections for a task.
+        
+        The message is serialized to JSON once and the same text is sent to
+        every subscriber; already-serialized JSON strings are sent as is.
+        Subscribers are sent to concurrently, and one that doesn't accept the
+        message within SEND_TIMEOUT_S is closed and dropped so it can't hold
+        up the others.
+        """
         if task_id not in self.active_connections:
             return
         
-        disconnected = []
-        for connection in self.active_connections[task_id]:
+        payload = message if isinstance(message, str) else _dumps(message)
+        
+        connections = list(self.active_connections[task_id])
+        sent = await asyncio.gather(*(self._send(connection, payload) for connection in connections))
+        
+        # Clean up disconnected and slow clients
+        for connection, ok in zip(connections, sent):
+            if not ok:
+                self.disconnect(task_id, connection)
+    
+    async def _send(self, connection: WebSocket, payload: str) -> bool:
+        try:
+            await asyncio.wait_for(connection.send_text(payload), SEND_TIMEOUT_S)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning("WebSocket client too slow, dropping it")
             try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error sending to WebSocket: {str(e)}")
-                disconnected.append(connection)
+                await asyncio.wait_for(connection.close(), SEND_TIMEOUT_S)
+            except Exception:
+                pass
+        except Exception as e:
+            logger.error(f"Error sending to WebSocket: {str(e)}")
+        return False
+    
+    def queue_update(self, task_id: str, update: dict):
+        """
+        Queue a streaming update for the task.
         
-        # Clean up disconnected clients
-        for connection in disconnected:
-            self.disconnect(task_id, connection)
+        Updates are coalesced and sent as one `{"updates": [...]}` message per
+        flush interval instead of one message per move.
+        """
+        self.pending_updates.setdefault(task_id, []).append(update)
+        if task_id not in self.drain_tasks:
+            self.drain_tasks[task_id] = asyncio.create_task(self.drain_loop(task_id))
+    
+    async def drain_loop(self, task_id: str):
+        """Periodically send queued updates for a task until the queue is empty."""
+        try:
+            while self.pending_updates.get(task_id):
+                await asyncio.sleep(FLUSH_INTERVAL_S)
+                await self._send_pending(task_id)
+        finally:
+            self.drain_tasks.pop(task_id, None)
+    
+    async def flush(self, task_id: str):
+        """Wait until every queued update for a task has been sent."""
+        task = self.drain_tasks.get(task_id)
+        if task is not None:
+            await task
+    
+    async def _send_pending(self, task_id: str):
+        updates = self.pending_updates.pop(task_id, None)
+        if updates:
+            await self.broadcast(task_id, {"updates": updates})
     
     async def listen(self, task_id: str, websocket: WebSocket):
         """Keep connection alive and listen for client messages."""
@@ -0,0 +1,67 @@
+"""Test following a game through a Polyglot opening book."""
+
+import os
+import struct
+import tempfile
+import chess
+import chess.polyglot
+from app.engine.book import find_book_line
+
+
+def _encode_move(move: chess.Move) -> int:
+    return (
+        chess.square_file(move.to_square)
+        | chess.square_rank(move.to_square) << 3
+        | chess.square_file(move.from_square) << 6
+        | chess.square_rank(move.from_square) << 9
+    )
+
+
+def _write_book(path: str, entries: list[tuple[chess.Board, str, int]]):
+    """Write (position, move, weight) entries as a Polyglot book."""
+    rows = sorted(
+        (chess.polyglot.zobrist_hash(board), _encode_move(chess.Move.from_uci(uci)), weight)
+        for board, uci, weight in entries
+    )
+    with open(path, "wb") as f:
+        for key, move, weight in rows:
+            f.write(struct.pack(">QHHI", key, move, weight, 0))
+
+
+def test_book_line_follows_played_moves():
+    """Test that the line stops at the first move that is not in the book."""
+    print("\n=== Test: Opening Book Line ===")
+    
+    start = chess.Board()
+    after_e4 = chess.Board()
+    after_e4.push_uci("e2e4")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "book.bin")
+        _write_book(path, [
+            (start, "d2d4", 5),
+            (start, "e2e4", 10),
+            (after_e4, "c7c5", 8),
+            (after_e4, "e7e5", 4),
+        ])
+        
+        moves = [chess.Move.from_uci(uci) for uci in ["e2e4", "e7e5", "g1f3"]]
+        with chess.polyglot.open_reader(path) as book:
+            line = find_book_line(moves, book)
+    
+    print(f"Book line: {line}")
+    
+    # Both played moves are in the book; the book's main move is reported as best
+    assert line == ["e2e4", "c7c5"]
+
+
+def test_no_book_configured():
+    """Test that no plies are treated as book moves without a book."""
+    moves = [chess.Move.from_uci("e2e4")]
+    assert find_book_line(moves, None) == []
+
+
+if __name__ == "__main__":
+    test_book_line_follows_played_moves()
+    test_no_book_configured()
+    print("\nALL TESTS PASSED ✓")
@@ -0,0 +1,56 @@
+"""Test the cross-game cache of engine search results."""
+
+import chess
+from app.config import settings
+from app.engine.analyzer import position_cache, _get_cached_search, _cache_search
+
+
+def test_position_cache_ignores_move_number():
+    """Test that the same position reached on a different move number is a hit."""
+    print("\n=== Test: Position Cache Key ===")
+    
+    position_cache.clear()
+    board = chess.Board()
+    board.push_uci("g1f3")
+    _cache_search(board.fen(), 10, ("g8f6", 20))
+    
+    # Same pieces, side to move and halfmove clock, later in the game
+    later = board.fen().replace(" 1 1", " 1 9")
+    print(f"Cached: {board.fen()} / Lookup: {later}")
+    
+    assert _get_cached_search(later, 10) == ("g8f6", 20)
+    assert _get_cached_search(later, 12) is None
+    
+    # Failed searches are not cached
+    _cache_search(chess.STARTING_FEN, 10, (None, 0))
+    assert _get_cached_search(chess.STARTING_FEN, 10) is None
+
+
+def test_position_cache_evicts_least_recently_used(monkeypatch):
+    """Test that the cache stays within POSITION_CACHE_SIZE."""
+    print("\n=== Test: Position Cache LRU Eviction ===")
+    
+    monkeypatch.setattr(settings, "POSITION_CACHE_SIZE", 2)
+    position_cache.clear()
+    
+    fens = []
+    board = chess.Board()
+    for uci in ["e2e4", "e7e5", "g1f3"]:
+        board.push_uci(uci)
+        fens.append(board.fen())
+    
+    _cache_search(fens[0], 10, ("e7e5", 30))
+    _cache_search(fens[1], 10, ("g1f3", 30))
+    _get_cached_search(fens[0], 10)
+    _cache_search(fens[2], 10, ("b8c6", 30))
+    
+    assert len(position_cache) == 2
+    assert _get_cached_search(fens[0], 10) is not None
+    assert _get_cached_search(fens[1], 10) is None
+    assert _get_cached_search(fens[2], 10) is not None
+    position_cache.clear()
+
+
+if __name__ == "__main__":
+    test_position_cache_ignores_move_number()
+    print("\nALL TESTS PASSED ✓")
@@ -0,0 +1,100 @@
+"""Test the bounded in-memory analysis result storage."""
+
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.routes import router
+from app.engine.analyzer import get_analysis_result, get_analysis_result_json, analysis_storage
+from app.models.schemas import (
+    GameAnalysisResult, GameSummary, PlayerSummary, MoveAnalysis, EngineEvaluation, MoveArrow
+)
+from app.utils.storage import MemoryStorage
+
+
+def _make_result(task_id: str, moves: list[MoveAnalysis] = None) -> GameAnalysisResult:
+    return GameAnalysisResult(
+        task_id=task_id,
+        headers={},
+        moves=moves or [],
+        summary=GameSummary(
+            white=PlayerSummary(accuracy=100.0),
+            black=PlayerSummary(accuracy=100.0)
+        )
+    )
+
+
+def test_memory_storage_evicts_least_recently_used():
+    """Test that the oldest untouched result is dropped once maxsize is reached."""
+    print("\n=== Test: Memory Storage LRU Eviction ===")
+    
+    storage = MemoryStorage(maxsize=2)
+    storage.put("a", _make_result("a"))
+    storage.put("b", _make_result("b"))
+    
+    # Reading "a" makes "b" the least recently used entry
+    assert storage.get("a") is not None
+    storage.put("c", _make_result("c"))
+    
+    print(f"Stored keys: a={storage.get('a') is not None}, "
+          f"b={storage.get('b') is not None}, c={storage.get('c') is not None}")
+    
+    assert storage.get("a") is not None
+    assert storage.get("b") is None
+    assert storage.get("c") is not None
+
+
+def test_analysis_result_lookup():
+    """Test that results stored by the analyzer are returned by task ID."""
+    print("\n=== Test: Analysis Result Lookup ===")
+    
+    analysis_storage.put("task-1", _make_result("task-1"))
+    
+    assert get_analysis_result("task-1").task_id == "task-1"
+    assert get_analysis_result("missing") is None
+    
+    # The pre-serialized form served by GET /api/game parses back to the same result
+    result_json = get_analysis_result_json("task-1")
+    assert GameAnalysisResult.model_validate_json(result_json) == get_analysis_result("task-1")
+    assert get_analysis_result_json("missing") is None
+
+
+def test_game_endpoint_uses_field_aliases():
+    """Test that GET /api/game serves arrows with the "from"/"to" keys the frontend reads."""
+    print("\n=== Test: Game Endpoint JSON Keys ===")
+    
+    move = MoveAnalysis(
+        index=0,
+        side="white",
+        san="e4",
+        uci="e2e4",
+        fen_before="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        fen_after="rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",
+        engine=EngineEvaluation(
+            best_move="e2e4",
+            played_eval_cp=30,
+            best_eval_cp=30,
+            eval_diff_cp=0,
+            win_probability=0.53
+        ),
+        classification="best",
+        accuracy=100.0,
+        opening=True,
+        arrows=[MoveArrow(from_square="e2", to_square="e4", type="best")]
+    )
+    analysis_storage.put("task-arrows", _make_result("task-arrows", [move]))
+    
+    app = FastAPI()
+    app.include_router(router)
+    response = TestClient(app).get("/api/game/task-arrows")
+    
+    assert response.status_code == 200
+    arrow = json.loads(response.content)["moves"][0]["arrows"][0]
+    print(f"Arrow: {arrow}")
+    assert arrow == {"from": "e2", "to": "e4", "type": "best"}
+
+
+if __name__ == "__main__":
+    test_memory_storage_evicts_least_recently_used()
+    test_analysis_result_lookup()
+    test_game_endpoint_uses_field_aliases()
+    print("\nALL TESTS PASSED ✓")
@@ -34,7 +34,11 @@ function AppContent() {
 
       const response = await startAnalysis({ pgn });
 
-      toast.success(`Analysis started! Total moves: ${response.total_moves}`);
+      toast.success(
+        response.status === 'queued'
+          ? `Analysis queued, waiting for a free engine. Total moves: ${response.total_moves}`
+          : `Analysis started! Total moves: ${response.total_moves}`
+      );
 
       const websocket = createWebSocket(
         response.task_id,
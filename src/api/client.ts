@@ -79,6 +79,9 @@ export function createWebSocket(
       // Check if this is a completion message
       if ('status' in message && message.status === 'complete') {
         onComplete(message as CompletionMessage);
+      } else if ('updates' in message) {
+        // Batch of streaming updates, in move order
+        message.updates.forEach(onUpdate);
       } else {
         // Regular streaming update
         onUpdate(message as StreamingUpdate);
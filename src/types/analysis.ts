@@ -76,7 +76,7 @@ export interface AnalysisRequest {
 
 export interface AnalysisStartResponse {
   task_id: string;
-  status: 'started';
+  status: 'started' | 'queued';
   total_moves: number;
 }
 
@@ -98,7 +98,11 @@ export interface CompletionMessage {
   total_moves: number;
 }
 
-export type WebSocketMessage = StreamingUpdate | CompletionMessage;
+export interface StreamingBatch {
+  updates: StreamingUpdate[];
+}
+
+export type WebSocketMessage = StreamingBatch | StreamingUpdate | CompletionMessage;
 
 export interface HealthResponse {
   status: 'healthy' | 'unhealthy';